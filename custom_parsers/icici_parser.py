@@ -1,6 +1,111 @@
+import numpy as np
 import pandas as pd
 import camelot
+import fitz  # PyMuPDF
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Translation table for stripping thousands separators before numeric coercion
+_COMMA_TBL = str.maketrans('', '', ',')
+
+# Minimal flag set for plain-text extraction: keep whitespace and page
+# clipping, skip ligature decomposition and image handling
+_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+# Transaction layout in raw text: date, description, amount, balance on
+# consecutive lines. Compiled once at import; parse() hits it per document.
+_TXN_RE = re.compile(r"(\d{2}-\d{2}-\d{4})\n(.+)\n(-?[\d,]*\.?\d+)\n(-?[\d,]*\.?\d+)")
+
+
+# Optional Hyperscan database for the same pattern: scans in a JIT-ed DFA
+# instead of Python's backtracking engine. Built once at import.
+_HS_DB = None
+if hyperscan is not None:
+    try:
+        _HS_DB = hyperscan.Database()
+        _HS_DB.compile(expressions=[_TXN_RE.pattern.encode()], ids=[1],
+                       flags=[hyperscan.HS_FLAG_SOM_LEFTMOST])
+    except Exception:
+        _HS_DB = None
+
+
+def _scan_transactions(text: str) -> list:
+    """
+    Returns transaction tuples from raw statement text, scanning with
+    Hyperscan when it is installed and falling back to re otherwise.
+
+    Hyperscan has no capture groups and reports every match end per start
+    offset, so keep the longest span per start and re-run _TXN_RE on each
+    span to split out the fields.
+    """
+    if _HS_DB is None:
+        return [m.groups() for m in _TXN_RE.finditer(text)]
+    data = text.encode()
+    ends = {}
+
+    def _on_match(pat_id, start, end, flags, ctx):
+        if end > ends.get(start, -1):
+            ends[start] = end
+
+    _HS_DB.scan(data, match_event_handler=_on_match)
+    rows = []
+    for start in sorted(ends):
+        m = _TXN_RE.match(data[start:ends[start]].decode("utf-8", "replace"))
+        if m:
+            rows.append(m.groups())
+    return rows
+
+
+def _parse_money(values) -> np.ndarray:
+    """
+    Converts money strings like '1,234.56' to float64 in a single pass,
+    writing straight into a preallocated array; empty or malformed cells
+    become NaN. Skips the pandas .str machinery entirely.
+    """
+    out = np.empty(len(values), dtype=np.float64)
+    for i, s in enumerate(values):
+        try:
+            out[i] = float(s.translate(_COMMA_TBL))
+        except (ValueError, AttributeError):
+            out[i] = np.nan
+    return out
+
+
+def _parse_text_fallback(pdf_path: str) -> pd.DataFrame:
+    """
+    Parses the statement from raw PDF text when Camelot finds no tables.
+
+    Runs a single compiled-regex pass over the whole document text instead of
+    splitting on newlines and matching line by line. The text layout carries
+    one amount per transaction; it is classified as debit or credit from the
+    running balance (an unknown first delta defaults to debit).
+    """
+    with fitz.open(pdf_path) as doc:
+        if doc.page_count > 1:
+            # get_text releases the GIL inside MuPDF, so pages extract in parallel
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+                text = "\n".join(ex.map(lambda i: doc[i].get_text("text", flags=_TEXT_FLAGS),
+                                        range(doc.page_count)))
+        else:
+            text = "\n".join(page.get_text("text", flags=_TEXT_FLAGS) for page in doc)
+
+    rows = _scan_transactions(text)
+    df = pd.DataFrame(rows, columns=["Date", "Description", "Amount", "Balance"])
+
+    for c in ('Amount', 'Balance'):
+        df[c] = _parse_money(df[c].to_numpy())
+    credit = df['Balance'].diff() > 0
+    df['Debit Amt'] = df['Amount'].where(~credit)
+    df['Credit Amt'] = df['Amount'].where(credit)
+    df['Date'] = pd.to_datetime(df['Date'], format='%d-%m-%Y', errors='coerce')
+
+    return df[["Date", "Description", "Debit Amt", "Credit Amt", "Balance"]]
 
 def parse(pdf_path: str) -> pd.DataFrame:
     """
@@ -14,24 +119,28 @@ def parse(pdf_path: str) -> pd.DataFrame:
         # Use Camelot with 'lattice' flavor to handle table borders and empty cells
         tables = camelot.read_pdf(pdf_path, pages='all', flavor='lattice')
 
-        # If no tables are found, return an empty DataFrame
+        # If no tables are found, fall back to raw text extraction
         if len(tables) == 0:
-            print("No tables found in the PDF.")
-            return pd.DataFrame()
+            print("No tables found in the PDF; falling back to text extraction.")
+            return _parse_text_fallback(pdf_path)
 
-        # Concatenate all tables into a single DataFrame
-        df = pd.concat([table.df for table in tables])
+        # Stack all tables into one array and build the DataFrame once,
+        # instead of pd.concat re-allocating and inferring dtypes per table
+        mat = np.vstack([table.df.to_numpy() for table in tables])
+        df = pd.DataFrame(mat, columns=["Date", "Description", "Debit Amt", "Credit Amt", "Balance"])
 
-        # The first row is the header; remove it
-        df = df.iloc[1:].reset_index(drop=True)
+        # Strip stray whitespace columnwise (vectorized; avoids per-cell applymap).
+        # .str.strip() yields NaN for non-string cells, so keep those as-is
+        for col in df.select_dtypes(include="object").columns:
+            stripped = df[col].str.strip()
+            df[col] = stripped.where(stripped.notna(), df[col])
 
-        # Set columns to match the expected schema
-        df.columns = ["Date", "Description", "Debit Amt", "Credit Amt", "Balance"]
+        # Drop the header row each page emits
+        df = df[df['Date'] != 'Date'].reset_index(drop=True)
 
         # Convert to numeric, handling commas and empty as NaN
-        df['Debit Amt'] = pd.to_numeric(df['Debit Amt'].str.replace(',', ''), errors='coerce')
-        df['Credit Amt'] = pd.to_numeric(df['Credit Amt'].str.replace(',', ''), errors='coerce')
-        df['Balance'] = pd.to_numeric(df['Balance'].str.replace(',', ''), errors='coerce')
+        for c in ('Debit Amt', 'Credit Amt', 'Balance'):
+            df[c] = _parse_money(df[c].to_numpy())
 
         # Convert date
         df['Date'] = pd.to_datetime(df['Date'], format='%d-%m-%Y', errors='coerce')
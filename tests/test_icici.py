@@ -1,5 +1,6 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -8,20 +9,55 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from custom_parsers.icici_parser import parse
 
-def test_parser():
-    """
-    Tests if the parser for ICICI bank statements works correctly.
-    """
-    # Relative paths
-    pdf_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'icici', 'icici_sample.pdf')
-    expected_csv_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'icici', 'icici_sample.csv')
+PDF_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'icici', 'icici_sample.pdf')
+CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'icici', 'icici_sample.csv')
+
+
+@pytest.fixture(scope="session")
+def parsed_df():
+    """Parses the sample PDF once per session; the parse dominates test time."""
+    return parse(PDF_PATH)
+
 
-    # Parse the PDF
-    parsed_df = parse(pdf_path)
+@pytest.fixture(scope="session")
+def expected_df():
+    """Loads the expected data once per session, via a Parquet cache when possible."""
+    parquet_path = CSV_PATH + '.parquet'
+    if os.path.exists(parquet_path) and os.stat(parquet_path).st_mtime >= os.stat(CSV_PATH).st_mtime:
+        try:
+            return pd.read_parquet(parquet_path)
+        except ImportError:
+            pass
+    df = pd.read_csv(
+        CSV_PATH,
+        parse_dates=['Date'],
+        date_format='%d-%m-%Y',
+        dtype={'Description': 'string', 'Debit Amt': 'float64',
+               'Credit Amt': 'float64', 'Balance': 'float64'},
+    )
+    try:
+        # Typed binary cache: later sessions skip CSV tokenization and date parsing
+        df.to_parquet(parquet_path)
+    except ImportError:
+        pass  # no parquet engine installed; the CSV read above still stands
+    return df
 
-    # Read the expected data from the CSV
-    expected_df = pd.read_csv(expected_csv_path)
-    expected_df['Date'] = pd.to_datetime(expected_df['Date'], format='%d-%m-%Y')
 
-    # Compare
-    pd.testing.assert_frame_equal(parsed_df, expected_df, check_dtype=False)
+def _frames_equal(a, b):
+    """Compares frames columnwise on the numpy buffers (fast C path)."""
+    if len(a) != len(b) or list(a.columns) != list(b.columns):
+        return False
+    return all(
+        np.array_equal(a[c].to_numpy(), b[c].to_numpy(),
+                       equal_nan=a[c].dtype.kind == 'f')
+        for c in a.columns
+    )
+
+
+def test_parser(parsed_df, expected_df):
+    """
+    Tests if the parser for ICICI bank statements works correctly.
+    """
+    if not _frames_equal(parsed_df, expected_df):
+        # Slow path only on mismatch, for the detailed diff
+        pd.testing.assert_frame_equal(parsed_df, expected_df, check_dtype=False)